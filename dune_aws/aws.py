@@ -1,16 +1,27 @@
 """Aws S3 Bucket functionality (namely upload_file)"""
 from __future__ import annotations
 
+import functools
 import json
+import math
 import os
-from collections import defaultdict
+import queue
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Optional
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Iterable, Iterator, Optional, TypeVar
 
 import boto3
-from boto3.resources.base import ServiceResource
-from boto3.s3.transfer import S3Transfer
+import orjson
+from boto3.s3.transfer import S3Transfer, TransferConfig
 from botocore.client import BaseClient
+from botocore.config import Config
 from dotenv import load_dotenv
 
 from dune_aws.logger import set_log
@@ -18,8 +29,182 @@ from dune_aws.text_io import BytesIteratorIO
 
 log = set_log(__name__)
 
+# Assumed role credentials are refreshed when they are this close to expiring.
+CREDENTIAL_REFRESH_MARGIN = timedelta(seconds=60)
+# Maximum number of keys accepted by a single S3 DeleteObjects request.
+DELETE_BATCH_SIZE = 1000
+# Seconds for which a bucket listing is reused (unless the bucket is modified).
+LISTING_TTL = 30
+# Number of concurrent requests issued for bulk bucket operations.
+MAX_WORKERS = 32
+# Number of listed objects buffered ahead of the consumer.
+PREFETCH_SIZE = 1000
+# Seconds between checks (of a blocked prefetch thread) for an abandoned consumer.
+PREFETCH_POLL_INTERVAL = 0.1
+# Shared by all STS and S3 sessions. The connection pool must be at least
+# MAX_WORKERS large, otherwise concurrent requests wait on pool checkout.
+BOTO_CONFIG = Config(
+    max_pool_connections=64,
+    retries={"mode": "adaptive", "max_attempts": 5},
+    tcp_keepalive=True,
+)
+# Streamed uploads are sent as multipart uploads of fixed size parts.
+MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_CHUNK_SIZE,
+    multipart_chunksize=MULTIPART_CHUNK_SIZE,
+    use_threads=True,
+    max_concurrency=8,
+)
+
+# Each record is serialized as a single (newline terminated) JSON line.
+# Non-string keys are stringified, as json.dumps would. Unlike json.dumps,
+# orjson writes non-ASCII characters unescaped and NaN/Infinity as null.
+JSON_LINE_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+# Compressed uploads favour speed: level 1 is much faster than the default
+# and compresses JSON lines nearly as well.
+GZIP_LEVEL = 1
+
+# Object keys are of the form `table/prefix_N.json`, where the index `N`
+# (and `.json` extension) are optional. Un-indexed names are kept whole.
+_KEY_RE = re.compile(
+    r"(?P<path>[^/]+)/(?P<name>(?P<prefix>[^/]*?)(?:_(?P<index>\d+)(?:\.json)?)?)"
+)
+
+T = TypeVar("T")
+
+
+def _match_index(match: re.Match[str]) -> Optional[int]:
+    """
+    Index of a matched object key. Indices with leading zeros (e.g. `cow_007`)
+    are not treated as such, since the key could not be reconstructed from them.
+    """
+    index = match["index"]
+    if index is None or str(int(index)) != index:
+        return None
+    return int(index)
+
+
+def _parse_key(object_key: str) -> tuple[str, str, Optional[int]]:
+    """Splits `object_key` into its (path, prefix, index) parts"""
+    match = _KEY_RE.fullmatch(object_key)
+    if match is None:
+        raise ValueError(f"invalid object key {object_key}")
+    index = _match_index(match)
+    if index is None:
+        # Keep the full reference for un-indexed files
+        return match["path"], match["name"], None
+    return match["path"], match["prefix"], index
+
+
+@functools.lru_cache(maxsize=1)
+def _bootstrap_sts_client() -> BaseClient:
+    """
+    STS client for the ambient (internal) credentials,
+    built once and shared by all AWSClient instances.
+    Built from a private session, since boto3's default session is not thread-safe.
+    """
+    return boto3.session.Session().client("sts", config=BOTO_CONFIG)  # type: ignore
+
+
+@functools.lru_cache(maxsize=1)
+def _load_env() -> None:
+    """Loads the .env file (at most once per process)"""
+    load_dotenv()
+
+
+def _nan_to_none(value: Any) -> Any:
+    """Replaces NaN and Infinity (nested in `value`) with None, as orjson does"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _nan_to_none(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_nan_to_none(item) for item in value]
+    return value
 
-@dataclass
+
+def _json_line(row: dict[str, Any]) -> bytes:
+    """Encodes `row` as a single (newline terminated) JSON line"""
+    try:
+        return orjson.dumps(row, option=JSON_LINE_OPTIONS)
+    except TypeError:
+        # orjson only supports 64-bit integers (e.g. not uint256 token amounts),
+        # fall back to json.dumps but produce the same output format as orjson.
+        line = json.dumps(_nan_to_none(row), separators=(",", ":"), ensure_ascii=False)
+        return line.encode("utf-8") + b"\n"
+
+
+def encode_json_lines(
+    data_set: list[dict[str, Any]], chunk_size: int = MULTIPART_CHUNK_SIZE
+) -> list[bytes]:
+    """
+    Encodes `data_set` as JSON lines, grouped into chunks of (at least)
+    `chunk_size` bytes, so the upload reads whole chunks rather than rows.
+    """
+    chunks: list[bytes] = []
+    buffer = bytearray()
+    for row in data_set:
+        buffer += _json_line(row)
+        if len(buffer) >= chunk_size:
+            chunks.append(bytes(buffer))
+            buffer.clear()
+    if buffer:
+        chunks.append(bytes(buffer))
+    return chunks
+
+
+def gzip_chunks(chunks: list[bytes]) -> list[bytes]:
+    """Compresses the concatenation of `chunks` into a gzip stream (as chunks)"""
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    compressed = [compressor.compress(chunk) for chunk in chunks]
+    compressed.append(compressor.flush())
+    return [chunk for chunk in compressed if chunk]
+
+
+def _prefetch(items: Iterable[T], buffer_size: int = PREFETCH_SIZE) -> Iterator[T]:
+    """
+    Iterates `items` on a background thread, so that fetching the next
+    elements (e.g. list pages) overlaps with processing the current ones.
+    Exceptions raised while fetching are re-raised to the consumer.
+    The thread stops once the consumer is done (or abandons iteration).
+    """
+    buffer: queue.Queue[tuple[bool, Any]] = queue.Queue(maxsize=buffer_size)
+    stopped = threading.Event()
+
+    def put(entry: tuple[bool, Any]) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(entry, timeout=PREFETCH_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put((True, item)):
+                    return
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            put((False, err))
+            return
+        put((False, None))
+
+    threading.Thread(target=produce, name="dune-aws-prefetch", daemon=True).start()
+    try:
+        while True:
+            has_item, item = buffer.get()
+            if not has_item:
+                if item is not None:
+                    raise item
+                return
+            yield item
+    finally:
+        stopped.set()
+
+
+@dataclass(slots=True, frozen=True)
 class BucketFileObject:
     """
     Basic Structure describing a file's location and associated index in AWS bucket
@@ -37,21 +222,7 @@ class BucketFileObject:
         Decompose the unique identifier `object_key` into
         more meaningful parts from which it can be reconstructed
         """
-        path, name = object_key.split("/")
-
-        name.replace(".json", "")
-        try:
-            split_name = name.split("_")
-            block = int(split_name[-1])
-            name = "_".join(split_name[:-1])
-        except ValueError:
-            # File structure does not satisfy block indexing!
-            block = None
-        return cls(
-            path,
-            name,  # Keep the full reference (for delete)
-            block,
-        )
+        return cls(*_parse_key(object_key))
 
     @property
     def object_key(self) -> str:
@@ -66,10 +237,12 @@ class BucketFileObject:
         """
         Object Filename (i.e. without the table)
         """
-        return self.prefix if not self.index else f"{self.prefix}_{self.index}.json"
+        if self.index is None:
+            return self.prefix
+        return f"{self.prefix}_{self.index}.json"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BucketStructure:
     """Representation of the bucket directory structure"""
 
@@ -80,14 +253,20 @@ class BucketStructure:
         """
         Constructor from results of ServiceResource.Buckets
         """
-        # Initialize empty lists (incase the directories contain nothing)
-        grouped_files: dict[str, list[BucketFileObject]] = defaultdict(
-            list[BucketFileObject]
-        )
-        for bucket_obj in bucket_objects:
-            object_key = bucket_obj.key
-            path, _ = object_key.split("/")
-            grouped_files[path].append(BucketFileObject.from_key(object_key))
+        return cls.from_keys(bucket_obj.key for bucket_obj in bucket_objects)
+
+    @classmethod
+    def from_keys(cls, object_keys: Iterable[str]) -> BucketStructure:
+        """
+        Constructor from the (listed) object keys of a bucket
+        """
+        # S3 lists keys in sorted order, so each directory is a contiguous run.
+        grouped_files: dict[str, list[BucketFileObject]] = {}
+        parsed_keys = (_parse_key(object_key) for object_key in object_keys)
+        for path, parts in groupby(parsed_keys, key=itemgetter(0)):
+            grouped_files.setdefault(path, []).extend(
+                BucketFileObject(*part) for part in parts
+            )
 
         log.debug(f"loaded bucket filesystem: {grouped_files.keys()}")
 
@@ -104,6 +283,10 @@ class BucketStructure:
 class AWSClient:
     """
     Class managing the roles required to do file operations on our S3 bucket
+
+    All underlying boto3 clients are built with `BOTO_CONFIG`: a pool of 64
+    kept-alive HTTPS connections (enough for the MAX_WORKERS bulk operations)
+    and adaptive retries (up to 5 attempts) for throttled requests.
     """
 
     def __init__(
@@ -113,11 +296,18 @@ class AWSClient:
         self.external_role = external_role
         self.external_id = external_id
         self.bucket = bucket
+        # Assumed role S3 client and the expiry of its credentials
+        # (cached until shortly before the credentials expire)
+        self._session: Optional[tuple[BaseClient, datetime]] = None
+        # Serializes credential refreshes of a shared (e.g. default) client
+        self._session_lock = threading.Lock()
+        # Most recent bucket listing (monotonic timestamp, structure)
+        self._listing_cache: Optional[tuple[float, BucketStructure]] = None
 
     @classmethod
     def new_from_environment(cls) -> AWSClient:
         """Constructs an instance of AWSClient from environment variables"""
-        load_dotenv()
+        _load_env()
         return cls(
             internal_role=os.environ["AWS_INTERNAL_ROLE"],
             external_role=os.environ["AWS_EXTERNAL_ROLE"],
@@ -125,86 +315,148 @@ class AWSClient:
             bucket=os.environ["AWS_BUCKET"],
         )
 
-    @staticmethod
-    def _get_s3_client(s3_resource: ServiceResource) -> BaseClient:
-        """Constructs a client session for S3 Bucket upload."""
-        return s3_resource.meta.client
-
-    def _assume_role(self) -> ServiceResource:
+    def _cached_s3_client(self) -> Optional[BaseClient]:
+        """The assumed role S3 client, unless its credentials are about to expire"""
+        session = self._session
+        if session is None:
+            return None
+        s3_client, expiry = session
+        if expiry - datetime.now(timezone.utc) <= CREDENTIAL_REFRESH_MARGIN:
+            return None
+        return s3_client
+
+    def _assume_role(self) -> BaseClient:
         """
         Borrowed from AWS documentation
         https://docs.aws.amazon.com/IAM/latest/UserGuide/id_roles_use_switch-role-api.html
+        The resulting session is reused until its credentials are about to expire.
+        Refreshes are serialized, so concurrent callers assume the role only once.
         """
-        sts_client = boto3.client("sts")
-
-        # TODO - assume that the internal role is already assumed. and use get session_token
-        # sts_client.get_session_token()
-        internal_assumed_role_object = sts_client.assume_role(
-            RoleArn=self.internal_role,
-            RoleSessionName="InternalSession",
-        )
-        credentials = internal_assumed_role_object["Credentials"]
-        # sts_client.get_session_token()
-
-        sts_client = boto3.client(
-            "sts",
-            aws_access_key_id=credentials["AccessKeyId"],  # AWS_ACCESS_KEY_ID
-            aws_secret_access_key=credentials[
-                "SecretAccessKey"
-            ],  # AWS_SECRET_ACCESS_KEY
-            aws_session_token=credentials["SessionToken"],  # AWS_SESSION_TOKEN
-        )
-
-        external_assumed_role_object = sts_client.assume_role(
-            RoleArn=self.external_role,
-            RoleSessionName="ExternalSession",
-            ExternalId=self.external_id,
-        )
-        credentials = external_assumed_role_object["Credentials"]
-
-        s3_resource: ServiceResource = boto3.resource(
-            "s3",
-            aws_access_key_id=credentials["AccessKeyId"],
-            aws_secret_access_key=credentials["SecretAccessKey"],
-            aws_session_token=credentials["SessionToken"],
-        )
-        return s3_resource
+        s3_client = self._cached_s3_client()
+        if s3_client is not None:
+            return s3_client
+
+        with self._session_lock:
+            # Another thread may have refreshed while we waited for the lock
+            s3_client = self._cached_s3_client()
+            if s3_client is not None:
+                return s3_client
+
+            sts_client = _bootstrap_sts_client()
+
+            # TODO - assume that the internal role is already assumed. and use get session_token
+            # sts_client.get_session_token()
+            internal_assumed_role_object = sts_client.assume_role(  # type: ignore
+                RoleArn=self.internal_role,
+                RoleSessionName="InternalSession",
+            )
+            credentials = internal_assumed_role_object["Credentials"]
+            # sts_client.get_session_token()
+
+            # Clients are built from a private session (not boto3's default one),
+            # which is not thread-safe.
+            boto_session = boto3.session.Session()
+            sts_client = boto_session.client(
+                "sts",
+                aws_access_key_id=credentials["AccessKeyId"],  # AWS_ACCESS_KEY_ID
+                aws_secret_access_key=credentials[
+                    "SecretAccessKey"
+                ],  # AWS_SECRET_ACCESS_KEY
+                aws_session_token=credentials["SessionToken"],  # AWS_SESSION_TOKEN
+                config=BOTO_CONFIG,
+            )
+
+            external_assumed_role_object = sts_client.assume_role(  # type: ignore
+                RoleArn=self.external_role,
+                RoleSessionName="ExternalSession",
+                ExternalId=self.external_id,
+            )
+            credentials = external_assumed_role_object["Credentials"]
+
+            s3_client = boto_session.client(
+                "s3",
+                aws_access_key_id=credentials["AccessKeyId"],
+                aws_secret_access_key=credentials["SecretAccessKey"],
+                aws_session_token=credentials["SessionToken"],
+                config=BOTO_CONFIG,
+            )
+            self._session = (s3_client, credentials["Expiration"])
+            log.debug(f"assumed external role until {credentials['Expiration']}")
+            return s3_client
 
     def upload_file(self, filename: str, table: str) -> bool:
         """Upload a file to an S3 bucket
         :return: True if file was uploaded, else raises
         """
-        s3_client = self._get_s3_client(self._assume_role())
+        s3_client = self._assume_role()
         S3Transfer(s3_client).upload_file(
             filename=filename,
             bucket=self.bucket,
             key=f"{table}/{filename}",
             extra_args={"ACL": "bucket-owner-full-control"},
         )
+        self._listing_cache = None
         log.debug(f"uploaded {filename} to {self.bucket}")
         return True
 
-    def put_object(self, data_set: list[dict[str, Any]], object_key: str) -> bool:
+    def _upload_chunks(
+        self, chunks: list[bytes], object_key: str, compress: bool
+    ) -> None:
+        """
+        Uploads the concatenation of `chunks` to `object_key`, (optionally) gzipped.
+        Content smaller than MULTIPART_CHUNK_SIZE is sent in a single request,
+        larger content is streamed as a multipart upload.
+        """
+        extra_args = {"ACL": "bucket-owner-full-control"}
+        if compress:
+            chunks = gzip_chunks(chunks)
+            extra_args |= {"ContentEncoding": "gzip", "ContentType": "application/json"}
+
+        size = sum(len(chunk) for chunk in chunks)
+        s3_client = self._assume_role()
+        if size < MULTIPART_CHUNK_SIZE:
+            s3_client.put_object(  # type: ignore
+                Bucket=self.bucket,
+                Key=object_key,
+                Body=b"".join(chunks),
+                ContentLength=size,
+                **extra_args,
+            )
+        else:
+            s3_client.upload_fileobj(  # type: ignore
+                BytesIteratorIO(iter(chunks)),
+                Bucket=self.bucket,
+                Key=object_key,
+                ExtraArgs=extra_args,
+                Config=TRANSFER_CONFIG,
+            )
+        self._listing_cache = None
+        log.debug(f"uploaded {size} bytes to {object_key}")
+
+    def put_object(
+        self, data_set: list[dict[str, Any]], object_key: str, compress: bool = True
+    ) -> bool:
         """Upload a file to an S3 bucket
 
         :param data_set: Data to upload. Should be a full path to file.
         :param object_key: S3 object key. For our purposes, this would
                            be f"{table_name}/cow_{latest_block_number}.json"
+        :param compress: Upload gzipped (with Content-Encoding: gzip).
         :return: True if file was uploaded, else raises
         """
+        self._upload_chunks(encode_json_lines(data_set), object_key, compress)
+        return True
 
-        file_object = BytesIteratorIO(
-            f"{json.dumps(row)}\n".encode("utf-8") for row in data_set
-        )
-
-        s3_client = self._get_s3_client(self._assume_role())
+    def put_bytes(self, body: bytes, object_key: str, compress: bool = True) -> bool:
+        """Upload already encoded content to an S3 bucket
 
-        s3_client.upload_fileobj(  # type: ignore
-            file_object,
-            Bucket=self.bucket,
-            Key=object_key,
-            ExtraArgs={"ACL": "bucket-owner-full-control"},
-        )
+        :param body: Encoded content (e.g. JSON lines) to upload.
+        :param object_key: S3 object key. For our purposes, this would
+                           be f"{table_name}/cow_{latest_block_number}.json"
+        :param compress: Upload gzipped (with Content-Encoding: gzip).
+        :return: True if file was uploaded, else raises
+        """
+        self._upload_chunks([body], object_key, compress)
         return True
 
     def delete_file(self, object_key: str) -> bool:
@@ -214,25 +466,34 @@ class AWSClient:
                            be f"{table_name}/cow_{latest_block_number}.json"
         :return: True if file was deleted, else raises
         """
-        s3_client = self._get_s3_client(self._assume_role())
+        s3_client = self._assume_role()
         s3_client.delete_object(  # type: ignore
             Bucket=self.bucket,
             Key=object_key,
         )
+        self._listing_cache = None
         log.debug(f"deleted {object_key} from {self.bucket}")
         return True
 
     def download_file(self, filename: str, table: str) -> bool:
         """
         Download a file, by name, from an S3 bucket
+        (gzip encoded content, as uploaded by `put_object`, is decompressed).
         :return: True if file was downloaded, else raises
         """
-        s3_client = self._get_s3_client(self._assume_role())
-        S3Transfer(s3_client).download_file(
-            filename=filename,
-            bucket=self.bucket,
-            key=f"{table}/{filename}",
+        s3_client = self._assume_role()
+        response = s3_client.get_object(  # type: ignore
+            Bucket=self.bucket,
+            Key=f"{table}/{filename}",
         )
+        decompressor = None
+        if response.get("ContentEncoding") == "gzip":
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        with open(filename, "wb") as file:
+            for chunk in response["Body"].iter_chunks(MULTIPART_CHUNK_SIZE):
+                file.write(decompressor.decompress(chunk) if decompressor else chunk)
+            if decompressor:
+                file.write(decompressor.flush())
         log.debug(f"downloaded {filename} from {self.bucket}")
         return True
 
@@ -240,35 +501,102 @@ class AWSClient:
         """
         Returns an object representing the bucket file
         structure with sync block metadata
+        (reused for LISTING_TTL seconds, or until this client modifies the bucket).
+        Each call returns its own copy, so callers may modify the result.
         """
-        service_resource = self._assume_role()
-        bucket = service_resource.Bucket(self.bucket)  # type: ignore
+        if (
+            self._listing_cache is None
+            or time.monotonic() - self._listing_cache[0] >= LISTING_TTL
+        ):
+            # Pages are listed lazily (and fetched ahead on a thread).
+            structure = BucketStructure.from_keys(_prefetch(self._list_keys("")))
+            self._listing_cache = (time.monotonic(), structure)
+
+        _, structure = self._listing_cache
+        return BucketStructure(
+            files={path: list(files) for path, files in structure.files.items()}
+        )
+
+    def _list_keys(self, prefix: str) -> Iterator[str]:
+        """Lazily yields the keys of all objects in the bucket under `prefix`"""
+        s3_client = self._assume_role()
+        paginator = s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for content in page.get("Contents", []):
+                yield content["Key"]
 
-        bucket_objects = bucket.objects.all()
-        return BucketStructure.from_bucket_collection(bucket_objects)
+    def existing_files_for(self, table: str) -> list[BucketFileObject]:
+        """
+        Returns the list of files under `table`
+        (filtered by S3, rather than listing the entire bucket).
+        """
+        return [
+            BucketFileObject.from_key(key)
+            for key in _prefetch(self._list_keys(f"{table}/"))
+        ]
 
     def last_sync_block(self, table: str) -> int:
         """
         Based on the existing bucket files,
         the last sync block is uniquely determined from the file names.
         """
-        try:
-            table_files = self.existing_files().get(table)
-            return max(file_obj.index for file_obj in table_files if file_obj.index)
-        except ValueError as err:
-            # Raised when table_files = []
+        last_block: Optional[int] = None
+        for key in _prefetch(self._list_keys(f"{table}/")):
+            match = _KEY_RE.fullmatch(key)
+            if match is None or match["index"] is None:
+                continue
+            # Zero-padded indices count too (padding only matters for keys)
+            index = int(match["index"])
+            if last_block is None or index > last_block:
+                last_block = index
+        if last_block is None:
             raise FileNotFoundError(
                 f"Could not determine last sync block for {table} files. No files."
-            ) from err
+            )
+        return last_block
+
+    def _delete_batch(self, s3_client: BaseClient, keys: list[str]) -> None:
+        """
+        Deletes (up to DELETE_BATCH_SIZE) `keys` in a single request
+        :raises RuntimeError: if any of the keys could not be deleted
+        """
+        log.info(f"Deleting {len(keys)} files")
+        response = s3_client.delete_objects(  # type: ignore
+            Bucket=self.bucket,
+            Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+        )
+        errors = response.get("Errors", [])
+        if errors:
+            failures = [f"{error['Key']} ({error['Code']})" for error in errors]
+            raise RuntimeError(f"failed to delete {len(errors)} files: {failures}")
 
     def delete_all(self, table: str) -> None:
         """Deletes all files within the supported tables directory"""
         log.info(f"Emptying Bucket {table}")
         try:
-            table_files = self.existing_files().get(table)
-            log.info(f"Found {len(table_files)} files to be removed.")
-            for file_data in table_files:
-                log.info(f"Deleting file {file_data.object_key}")
-                self.delete_file(file_data.object_key)
-        except KeyError as err:
-            raise ValueError(f"invalid table name {table}") from err
+            # Delete the listed keys themselves (rather than reconstructed ones)
+            keys = list(_prefetch(self._list_keys(f"{table}/")))
+            log.info(f"Found {len(keys)} files to be removed.")
+            s3_client = self._assume_role()
+            batches = [
+                keys[i : i + DELETE_BATCH_SIZE]
+                for i in range(0, len(keys), DELETE_BATCH_SIZE)
+            ]
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                # Consume results so that failures are raised here
+                list(
+                    executor.map(
+                        lambda batch: self._delete_batch(s3_client, batch), batches
+                    )
+                )
+        finally:
+            self._listing_cache = None
+
+
+@functools.lru_cache(maxsize=1)
+def get_default_client() -> AWSClient:
+    """
+    AWSClient constructed from environment variables,
+    shared (along with its cached credentials) by all callers in the process.
+    """
+    return AWSClient.new_from_environment()
@@ -2,16 +2,51 @@
 Abstraction for New Content Handling
 provides a framework for writing new content to disk and posting to AWS
 """
-import sys
+import time
 from typing import Any, Optional
 
+from botocore.exceptions import ClientError
 from s3transfer import S3UploadFailedError
-from dune_aws.aws import AWSClient, BucketFileObject
+from dune_aws.aws import (
+    AWSClient,
+    BucketFileObject,
+    encode_json_lines,
+    get_default_client,
+)
 
 from dune_aws.logger import set_log
 
 log = set_log(__name__)
 
+# Number of times an upload is attempted (with exponential backoff in between)
+UPLOAD_ATTEMPTS = 3
+# S3 error codes for which an upload is worth retrying (beyond 5xx responses)
+RETRYABLE_ERROR_CODES = frozenset(
+    {
+        "RequestTimeout",
+        "SlowDown",
+        "Throttling",
+        "ThrottlingException",
+        "RequestLimitExceeded",
+        "InternalError",
+        "ServiceUnavailable",
+    }
+)
+
+
+class RecordHandlerError(Exception):
+    """Raised when new content could not be posted to AWS"""
+
+
+def _is_retryable(err: ClientError | S3UploadFailedError) -> bool:
+    """Whether a failed upload may succeed when attempted again"""
+    if isinstance(err, S3UploadFailedError):
+        return True
+    status = err.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+    return err.response.get("Error", {}).get("Code") in RETRYABLE_ERROR_CODES or (
+        status >= 500
+    )
+
 
 class RecordHandler:
 
@@ -31,33 +66,49 @@ class RecordHandler:
         else:
             self.file = file
         self.data_set = data_set
+        # JSON lines encoding of data_set (computed once, on first upload)
+        self._encoded: Optional[bytes] = None
 
-        # Lazy load the aws client (or provide your own)
-        self.aws = AWSClient.new_from_environment() if not aws else aws
+        # Lazy load the shared aws client (or provide your own)
+        self.aws = get_default_client() if not aws else aws
 
     def num_records(self) -> int:
         """Returns number of records to handle"""
         return len(self.data_set)
 
-    def upload_content(self, delete_first: bool = False) -> None:
-        """uploads `self.data_set` to aws bucket under `self.object_key`"""
+    def encoded_body(self) -> bytes:
+        """Returns `self.data_set` encoded as JSON lines"""
+        if self._encoded is None:
+            self._encoded = b"".join(encode_json_lines(self.data_set))
+        return self._encoded
+
+    def upload_content(self, delete_first: bool = False, compress: bool = True) -> None:
+        """
+        uploads `self.data_set` to aws bucket under `self.object_key`
+        (gzip encoded, unless `compress` is False)
+        """
         count = self.num_records()
         object_key = self.file.object_key
         if count > 0:
             log.info(f"posting {count} new records to {object_key}")
-            try:
-                if delete_first:
-                    self.aws.delete_file(object_key)
-
-                self.aws.put_object(
-                    data_set=self.data_set,
-                    object_key=object_key,
-                )
-                log.info(f"{object_key} post complete: added {count} records")
-                return
-            except S3UploadFailedError as err:
-                log.error(err)
-                sys.exit(1)
+            if delete_first:
+                self.aws.delete_file(object_key)
 
+            for attempt in range(UPLOAD_ATTEMPTS):
+                try:
+                    self.aws.put_bytes(
+                        body=self.encoded_body(),
+                        object_key=object_key,
+                        compress=compress,
+                    )
+                    break
+                except (ClientError, S3UploadFailedError) as err:
+                    log.error(f"upload attempt {attempt + 1} failed: {err}")
+                    if not _is_retryable(err) or attempt + 1 == UPLOAD_ATTEMPTS:
+                        raise RecordHandlerError(
+                            f"failed to post {count} records to {object_key}"
+                        ) from err
+                    time.sleep(2**attempt)
+            log.info(f"{object_key} post complete: added {count} records")
         else:
             log.info(f"No new records for {self.file.path} - sync not necessary")
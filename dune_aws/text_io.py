@@ -41,36 +41,29 @@ class StringIteratorIO(io.TextIOBase):
 
 
 class BytesIteratorIO(io.BufferedIOBase):
+    """
+    Reads of `n` bytes are coalesced from the underlying iterator into exactly
+    `n` bytes (fewer only at the end of the stream), so that consumers reading
+    fixed size parts (e.g. multipart uploads) never fall back to buffering.
+    """
+
     def __init__(self, iter: Iterator[bytes]):
         self._iter = iter
-        self._buff = b""
+        self._buff = bytearray()
 
     def readable(self) -> bool:
         return True
 
-    def _read1(self, n: Optional[int] = None) -> bytes:
-        while not self._buff:
-            try:
-                self._buff = next(self._iter)
-            except StopIteration:
-                break
-        ret = self._buff[:n]
-        self._buff = self._buff[len(ret) :]
-        return ret
-
     def read(self, n: Optional[int] = None) -> bytes:
-        line = []
         if n is None or n < 0:
-            while True:
-                m = self._read1()
-                if not m:
-                    break
-                line.append(m)
+            self._buff.extend(b"".join(self._iter))
+            n = len(self._buff)
         else:
-            while n > 0:
-                m = self._read1(n)
-                if not m:
+            while len(self._buff) < n:
+                try:
+                    self._buff.extend(next(self._iter))
+                except StopIteration:
                     break
-                n -= len(m)
-                line.append(m)
-        return b"".join(line)
+        ret = bytes(self._buff[:n])
+        del self._buff[:n]
+        return ret
@@ -32,8 +32,9 @@ class TestAWSConnection(unittest.TestCase):
             pass
 
     def test_assumed_role(self):
-        s3_resource = self.aws_client._assume_role()
-        self.assertIsNotNone(s3_resource.buckets)
+        s3_client = self.aws_client._assume_role()
+        self.assertEqual(s3_client.meta.service_model.service_name, "s3")
+        self.assertIs(s3_client, self.aws_client._assume_role())
 
     def create_upload_remove(self):
         Path(self.empty_file).touch()
@@ -63,6 +64,28 @@ class TestAWSConnection(unittest.TestCase):
         # cleanup
         self.assertTrue(self.aws_client.delete_file(object_key))
 
+    def test_put_object_download(self):
+        table = "test_put"
+        filename = "download_file.json"
+        self.aws_client.put_object([{"x": 1, "y": 2}, {"z": 3}], f"{table}/{filename}")
+
+        try:
+            self.assertTrue(self.aws_client.download_file(filename, table))
+            with open(filename, "rb") as file:
+                self.assertEqual(file.read(), b'{"x":1,"y":2}\n{"z":3}\n')
+        finally:
+            os.remove(Path(filename))
+            self.aws_client.delete_file(f"{table}/{filename}")
+
+    def test_put_bytes(self):
+        object_key = "test_put/bytes_file.json"
+        success = self.aws_client.put_bytes(b'{"x":1,"y":2}\n{"z":3}\n', object_key)
+
+        self.assertTrue(success)
+
+        # cleanup
+        self.assertTrue(self.aws_client.delete_file(object_key))
+
     def test_download_file(self):
         # Upload file and remove it from our filesystem
         self.create_upload_remove()
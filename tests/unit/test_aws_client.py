@@ -0,0 +1,363 @@
+import gzip
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from botocore.response import StreamingBody
+
+from dune_aws.aws import (
+    AWSClient,
+    BucketFileObject,
+    _bootstrap_sts_client,
+    _prefetch,
+    encode_json_lines,
+    gzip_chunks,
+)
+
+
+def credentials(expires_in: timedelta) -> dict:
+    return {
+        "Credentials": {
+            "AccessKeyId": "key",
+            "SecretAccessKey": "secret",
+            "SessionToken": "token",
+            "Expiration": datetime.now(timezone.utc) + expires_in,
+        }
+    }
+
+
+class TestAWSClient(unittest.TestCase):
+    def setUp(self) -> None:
+        self.aws = AWSClient(
+            internal_role="internal",
+            external_role="external",
+            external_id="id",
+            bucket="bucket",
+        )
+        _bootstrap_sts_client.cache_clear()
+
+    @patch("dune_aws.aws.boto3")
+    def test_assume_role_is_cached(self, mock_boto3):
+        boto_session = mock_boto3.session.Session.return_value
+        sts = boto_session.client.return_value
+        sts.assume_role.return_value = credentials(timedelta(hours=1))
+
+        first = self.aws._assume_role()
+        second = self.aws._assume_role()
+
+        self.assertIs(first, second)
+        self.assertEqual(sts.assume_role.call_count, 2)
+        # One bootstrap STS client, one for the internal role session and S3
+        self.assertEqual(boto_session.client.call_count, 3)
+        mock_boto3.client.assert_not_called()
+
+    @patch("dune_aws.aws.boto3")
+    def test_assume_role_refreshes_near_expiry(self, mock_boto3):
+        boto_session = mock_boto3.session.Session.return_value
+        sts = MagicMock()
+        sts.assume_role.return_value = credentials(timedelta(seconds=30))
+        boto_session.client.side_effect = lambda *args, **kwargs: (
+            sts if args == ("sts",) else MagicMock()
+        )
+
+        first = self.aws._assume_role()
+        second = self.aws._assume_role()
+
+        self.assertIsNot(first, second)
+        self.assertEqual(sts.assume_role.call_count, 4)
+
+    @patch("dune_aws.aws.boto3")
+    def test_assume_role_concurrent_refresh(self, mock_boto3):
+        sts = mock_boto3.session.Session.return_value.client.return_value
+
+        def slow_assume_role(**kwargs):
+            time.sleep(0.05)
+            return credentials(timedelta(hours=1))
+
+        sts.assume_role.side_effect = slow_assume_role
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(executor.map(lambda _: self.aws._assume_role(), range(8)))
+
+        self.assertEqual(len({id(client) for client in clients}), 1)
+        self.assertEqual(sts.assume_role.call_count, 2)
+
+    def test_existing_files_for_lists_table_prefix(self):
+        with patch.object(AWSClient, "_assume_role") as assume_role:
+            s3_client = assume_role.return_value
+            paginator = s3_client.get_paginator.return_value
+            paginator.paginate.return_value = [
+                {
+                    "Contents": [
+                        {"Key": "table/cow_1.json"},
+                        {"Key": "table/cow_2.json"},
+                    ]
+                },
+                {"Contents": [{"Key": "table/moo.json"}]},
+                {},
+            ]
+            files = self.aws.existing_files_for("table")
+
+        s3_client.get_paginator.assert_called_once_with("list_objects_v2")
+        paginator.paginate.assert_called_once_with(Bucket="bucket", Prefix="table/")
+        self.assertEqual(
+            files,
+            [
+                BucketFileObject("table", "cow", 1),
+                BucketFileObject("table", "cow", 2),
+                BucketFileObject("table", "moo.json", None),
+            ],
+        )
+
+    def test_last_sync_block(self):
+        with patch.object(AWSClient, "_list_keys") as list_keys:
+            list_keys.return_value = iter(
+                [
+                    "table/cow_011.json",
+                    "table/cow_9.json",
+                    "table/cow_10.json",
+                    "table/moo.json",
+                ]
+            )
+            self.assertEqual(self.aws.last_sync_block("table"), 11)
+            list_keys.assert_called_once_with("table/")
+
+            list_keys.return_value = iter(["table/cow_007.json", "table/cow_008.json"])
+            self.assertEqual(self.aws.last_sync_block("table"), 8)
+
+            list_keys.return_value = iter(["table/moo.json"])
+            with self.assertRaises(FileNotFoundError):
+                self.aws.last_sync_block("table")
+
+    def test_existing_files_is_cached(self):
+        with patch.object(AWSClient, "_assume_role"), patch.object(
+            AWSClient, "_list_keys", side_effect=lambda prefix: iter([])
+        ) as list_keys:
+            first = self.aws.existing_files()
+            self.assertEqual(first, self.aws.existing_files())
+            self.assertEqual(list_keys.call_count, 1)
+
+            self.aws.delete_file("table/cow_1.json")
+            self.aws.existing_files()
+            self.assertEqual(list_keys.call_count, 2)
+
+    def test_existing_files_returns_copies(self):
+        keys = ["table/cow_1.json", "table/cow_2.json"]
+        with patch.object(AWSClient, "_assume_role"), patch.object(
+            AWSClient, "_list_keys", side_effect=lambda prefix: iter(keys)
+        ) as list_keys:
+            first = self.aws.existing_files()
+            first.files["table"].clear()
+            first.files["other"] = []
+
+            second = self.aws.existing_files()
+            self.assertEqual(list_keys.call_count, 1)
+
+        self.assertEqual([f.object_key for f in second.get("table")], keys)
+        self.assertNotIn("other", second.files)
+
+    def test_put_object_small_payload_single_request(self):
+        with patch.object(AWSClient, "_assume_role") as assume_role:
+            s3_client = assume_role.return_value
+            self.assertTrue(
+                self.aws.put_object([{"x": 1}], "table/cow_1.json", compress=False)
+            )
+
+        s3_client.put_object.assert_called_once_with(
+            Bucket="bucket",
+            Key="table/cow_1.json",
+            Body=b'{"x":1}\n',
+            ContentLength=8,
+            ACL="bucket-owner-full-control",
+        )
+        s3_client.upload_fileobj.assert_not_called()
+
+    def test_put_object_compressed(self):
+        with patch.object(AWSClient, "_assume_role") as assume_role:
+            s3_client = assume_role.return_value
+            self.aws.put_object([{"x": 1}, {"y": 2}], "table/cow_1.json")
+
+        kwargs = s3_client.put_object.call_args.kwargs
+        self.assertEqual(gzip.decompress(kwargs["Body"]), b'{"x":1}\n{"y":2}\n')
+        self.assertEqual(kwargs["ContentLength"], len(kwargs["Body"]))
+        self.assertEqual(kwargs["ContentEncoding"], "gzip")
+        self.assertEqual(kwargs["ContentType"], "application/json")
+
+    def download(self, s3_client, response: dict) -> bytes:
+        s3_client.get_object.return_value = response
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.chdir(tmp_dir)
+            try:
+                self.assertTrue(self.aws.download_file("cow_1.json", "table"))
+                with open("cow_1.json", "rb") as file:
+                    return file.read()
+            finally:
+                os.chdir(cwd)
+
+    def test_download_file_decompresses_put_object(self):
+        data_set = [{"x": 1}, {"y": "z"}]
+        with patch.object(AWSClient, "_assume_role") as assume_role:
+            s3_client = assume_role.return_value
+            self.aws.put_object(data_set, "table/cow_1.json")
+            uploaded = s3_client.put_object.call_args.kwargs
+
+            content = self.download(
+                s3_client,
+                {
+                    "ContentEncoding": uploaded["ContentEncoding"],
+                    "Body": StreamingBody(
+                        io.BytesIO(uploaded["Body"]), uploaded["ContentLength"]
+                    ),
+                },
+            )
+
+        s3_client.get_object.assert_called_once_with(
+            Bucket="bucket", Key="table/cow_1.json"
+        )
+        s3_client.head_object.assert_not_called()
+        self.assertEqual(content, b'{"x":1}\n{"y":"z"}\n')
+
+    def test_download_file_uncompressed(self):
+        body = b'{"x":1}\n'
+        with patch.object(AWSClient, "_assume_role") as assume_role:
+            s3_client = assume_role.return_value
+            content = self.download(
+                s3_client, {"Body": StreamingBody(io.BytesIO(body), len(body))}
+            )
+
+        s3_client.get_object.assert_called_once()
+        s3_client.head_object.assert_not_called()
+        self.assertEqual(content, body)
+
+    @patch("dune_aws.aws.MULTIPART_CHUNK_SIZE", 16)
+    def test_put_bytes_large_payload_multipart(self):
+        with patch.object(AWSClient, "_assume_role") as assume_role:
+            s3_client = assume_role.return_value
+            self.assertTrue(
+                self.aws.put_bytes(b"x" * 16, "table/cow_1.json", compress=False)
+            )
+
+        s3_client.put_object.assert_not_called()
+        s3_client.upload_fileobj.assert_called_once()
+
+    def test_delete_all_batches_requests(self):
+        keys = [f"table/cow_{i:03}.json" for i in range(2501)]
+        with patch.object(AWSClient, "_assume_role") as assume_role, patch.object(
+            AWSClient, "_list_keys", return_value=iter(keys)
+        ) as list_keys:
+            s3_client = assume_role.return_value
+            s3_client.delete_objects.return_value = {}
+            self.aws.delete_all("table")
+
+        list_keys.assert_called_once_with("table/")
+        batches = [
+            [obj["Key"] for obj in call.kwargs["Delete"]["Objects"]]
+            for call in s3_client.delete_objects.call_args_list
+        ]
+        self.assertEqual(sorted(len(batch) for batch in batches), [501, 1000, 1000])
+        # The listed keys are deleted as is
+        self.assertEqual(
+            sorted(key for batch in batches for key in batch), sorted(keys)
+        )
+        s3_client.delete_object.assert_not_called()
+
+    def test_delete_all_raises_on_errors(self):
+        with patch.object(AWSClient, "_assume_role") as assume_role, patch.object(
+            AWSClient, "_list_keys", return_value=iter(["table/cow_1.json"])
+        ):
+            s3_client = assume_role.return_value
+            s3_client.delete_objects.return_value = {
+                "Errors": [
+                    {
+                        "Key": "table/cow_1.json",
+                        "Code": "AccessDenied",
+                        "Message": "Access Denied",
+                    }
+                ]
+            }
+            with self.assertRaises(RuntimeError):
+                self.aws.delete_all("table")
+
+
+class TestPrefetch(unittest.TestCase):
+    def test_preserves_order(self):
+        self.assertEqual(
+            list(_prefetch(range(5000), buffer_size=10)), list(range(5000))
+        )
+
+    def test_propagates_errors(self):
+        def failing():
+            yield 1
+            raise RuntimeError("listing failed")
+
+        with self.assertRaises(RuntimeError):
+            list(_prefetch(failing()))
+
+    def test_stops_when_abandoned(self):
+        def endless():
+            while True:
+                yield 1
+
+        items = _prefetch(endless(), buffer_size=1)
+        next(items)
+        items.close()
+
+        deadline = time.monotonic() + 2
+        while any(t.name == "dune-aws-prefetch" for t in threading.enumerate()):
+            self.assertLess(time.monotonic(), deadline, "prefetch thread still alive")
+            time.sleep(0.05)
+
+
+class TestEncodeJsonLines(unittest.TestCase):
+    def test_encodes_rows_as_lines(self):
+        data_set = [{"x": 1, "y": 2}, {"z": 3}]
+        self.assertEqual(encode_json_lines(data_set), [b'{"x":1,"y":2}\n{"z":3}\n'])
+
+    def test_encodes_large_integers(self):
+        data_set = [{"amount": 2**64}, {"amount": 10**30, "x": 1}, {"x": 1}]
+        self.assertEqual(
+            encode_json_lines(data_set),
+            [
+                b'{"amount":18446744073709551616}\n'
+                b'{"amount":1000000000000000000000000000000,"x":1}\n'
+                b'{"x":1}\n'
+            ],
+        )
+
+    def test_large_integer_rows_match_orjson_format(self):
+        row = {"n": "é", "f": float("nan"), "l": [float("inf"), 1.5]}
+        self.assertEqual(
+            encode_json_lines([{**row, "amount": 2**64}, row]),
+            [
+                b'{"n":"\xc3\xa9","f":null,"l":[null,1.5],"amount":18446744073709551616}\n'
+                b'{"n":"\xc3\xa9","f":null,"l":[null,1.5]}\n'
+            ],
+        )
+
+    def test_chunks_by_size(self):
+        data_set = [{"x": i} for i in range(10)]
+        chunks = encode_json_lines(data_set, chunk_size=16)
+
+        self.assertEqual(b"".join(chunks), b"".join(encode_json_lines(data_set)))
+        self.assertTrue(all(len(chunk) >= 16 for chunk in chunks[:-1]))
+        self.assertEqual(len(chunks), 5)
+
+    def test_empty(self):
+        self.assertEqual(encode_json_lines([]), [])
+
+    def test_gzip_chunks(self):
+        chunks = encode_json_lines([{"x": i} for i in range(100)], chunk_size=64)
+        self.assertEqual(
+            gzip.decompress(b"".join(gzip_chunks(chunks))), b"".join(chunks)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
+from dataclasses import FrozenInstanceError
+from types import SimpleNamespace
 
-from dune_aws.aws import BucketFileObject
+from dune_aws.aws import BucketFileObject, BucketStructure
 
 
 class TestBucketFileObject(unittest.TestCase):
@@ -11,6 +13,18 @@ class TestBucketFileObject(unittest.TestCase):
 
         self.assertEqual(bf.object_key, "table/cow_2.json")
 
+    def test_bucket_file_zero_index(self):
+        bf = BucketFileObject(path="table", prefix="cow", index=0)
+
+        self.assertEqual(bf.object_key, "table/cow_0.json")
+        self.assertEqual(BucketFileObject.from_key(bf.object_key), bf)
+
+    def test_bucket_file_is_immutable(self):
+        bf = BucketFileObject(path="table", prefix="cow", index=2)
+        self.assertFalse(hasattr(bf, "__dict__"))
+        with self.assertRaises(FrozenInstanceError):
+            bf.index = 3
+
     def test_bucket_file_constructor(self):
         indexed_key = "table/cow_2.json"
 
@@ -19,11 +33,51 @@ class TestBucketFileObject(unittest.TestCase):
         other_key = "table/moo.json"
         self.assertEqual(BucketFileObject.from_key(other_key).object_key, other_key)
 
+    def test_bucket_file_constructor_parts(self):
+        self.assertEqual(
+            BucketFileObject.from_key("table/cow_2.json"),
+            BucketFileObject(path="table", prefix="cow", index=2),
+        )
+        self.assertEqual(
+            BucketFileObject.from_key("table/moo_cow_123"),
+            BucketFileObject(path="table", prefix="moo_cow", index=123),
+        )
+        self.assertEqual(
+            BucketFileObject.from_key("table/moo.json"),
+            BucketFileObject(path="table", prefix="moo.json", index=None),
+        )
+
+    def test_bucket_file_constructor_leading_zeros(self):
+        for key in ["table/cow_007.json", "table/cow_00.json", "table/moo_01"]:
+            self.assertEqual(BucketFileObject.from_key(key).object_key, key)
+        self.assertEqual(
+            BucketFileObject.from_key("table/cow_007.json"),
+            BucketFileObject(path="table", prefix="cow_007.json", index=None),
+        )
+
     def test_bucket_file_constructor_error(self):
         with self.assertRaises(ValueError):
             # No table
             # not enough values to unpack (expected 2, got 1)
             BucketFileObject.from_key("file.json")
+        with self.assertRaises(ValueError):
+            # Nested directories
+            BucketFileObject.from_key("table/nested/file.json")
+
+
+class TestBucketStructure(unittest.TestCase):
+    def test_from_bucket_collection(self):
+        keys = ["a/cow_1.json", "a/cow_2.json", "b/moo.json", "a/cow_3.json"]
+        structure = BucketStructure.from_bucket_collection(
+            SimpleNamespace(key=key) for key in keys
+        )
+
+        self.assertEqual(
+            [f.object_key for f in structure.get("a")],
+            ["a/cow_1.json", "a/cow_2.json", "a/cow_3.json"],
+        )
+        self.assertEqual(structure.get("b"), [BucketFileObject("b", "moo.json", None)])
+        self.assertEqual(structure.get("c"), [])
 
 
 if __name__ == "__main__":
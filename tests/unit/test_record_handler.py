@@ -0,0 +1,101 @@
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from botocore.exceptions import ClientError
+from s3transfer import S3UploadFailedError
+
+from dune_aws.aws import get_default_client
+from dune_aws.record_handler import RecordHandler, RecordHandlerError
+
+
+class TestRecordHandler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.aws = MagicMock()
+        self.handler = RecordHandler(
+            file="table/cow_1.json", data_set=[{"x": 1}], aws=self.aws
+        )
+
+    @patch("dune_aws.record_handler.time.sleep")
+    def test_upload_content_retries(self, sleep):
+        self.aws.put_bytes.side_effect = [S3UploadFailedError("boom"), True]
+
+        self.handler.upload_content()
+
+        self.assertEqual(self.aws.put_bytes.call_count, 2)
+        sleep.assert_called_once_with(1)
+        self.aws.put_bytes.assert_called_with(
+            body=b'{"x":1}\n', object_key="table/cow_1.json", compress=True
+        )
+
+    def test_upload_content_uncompressed(self):
+        self.handler.upload_content(compress=False)
+
+        self.aws.put_bytes.assert_called_once_with(
+            body=b'{"x":1}\n', object_key="table/cow_1.json", compress=False
+        )
+
+    @patch("dune_aws.record_handler.time.sleep")
+    def test_upload_content_raises_after_retries(self, sleep):
+        self.aws.put_bytes.side_effect = S3UploadFailedError("boom")
+
+        with self.assertRaises(RecordHandlerError):
+            self.handler.upload_content(delete_first=True)
+
+        self.aws.delete_file.assert_called_once_with("table/cow_1.json")
+        self.assertEqual(self.aws.put_bytes.call_count, 3)
+        self.assertEqual([c.args for c in sleep.call_args_list], [(1,), (2,)])
+
+    @patch("dune_aws.record_handler.time.sleep")
+    def test_upload_content_retries_throttling(self, sleep):
+        throttled = ClientError({"Error": {"Code": "SlowDown"}}, "PutObject")
+        self.aws.put_bytes.side_effect = [throttled, True]
+
+        self.handler.upload_content()
+
+        self.assertEqual(self.aws.put_bytes.call_count, 2)
+        sleep.assert_called_once_with(1)
+
+    @patch("dune_aws.record_handler.time.sleep")
+    def test_upload_content_does_not_retry_permanent_errors(self, sleep):
+        self.aws.put_bytes.side_effect = ClientError(
+            {
+                "Error": {"Code": "AccessDenied"},
+                "ResponseMetadata": {"HTTPStatusCode": 403},
+            },
+            "PutObject",
+        )
+
+        with self.assertRaises(RecordHandlerError):
+            self.handler.upload_content()
+
+        self.aws.put_bytes.assert_called_once()
+        sleep.assert_not_called()
+
+    def test_encoded_body_is_memoized(self):
+        body = self.handler.encoded_body()
+
+        self.assertEqual(body, b'{"x":1}\n')
+        self.assertIs(body, self.handler.encoded_body())
+
+    @patch.dict(
+        os.environ,
+        {
+            "AWS_INTERNAL_ROLE": "internal",
+            "AWS_EXTERNAL_ROLE": "external",
+            "AWS_EXTERNAL_ID": "id",
+            "AWS_BUCKET": "bucket",
+        },
+    )
+    def test_default_client_is_shared(self):
+        get_default_client.cache_clear()
+        first = RecordHandler(file="table/cow_1.json", data_set=[])
+        second = RecordHandler(file="table/cow_2.json", data_set=[])
+
+        self.assertIs(first.aws, second.aws)
+        self.assertEqual(first.aws.bucket, "bucket")
+        get_default_client.cache_clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
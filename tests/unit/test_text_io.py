@@ -0,0 +1,24 @@
+import unittest
+
+from dune_aws.text_io import BytesIteratorIO
+
+
+class TestBytesIteratorIO(unittest.TestCase):
+    def test_read_coalesces_exact_sizes(self):
+        stream = BytesIteratorIO(iter([b"ab", b"cde", b"", b"fghij", b"k"]))
+
+        self.assertEqual(stream.read(4), b"abcd")
+        self.assertEqual(stream.read(4), b"efgh")
+        self.assertEqual(stream.read(4), b"ijk")
+        self.assertEqual(stream.read(4), b"")
+
+    def test_read_all(self):
+        stream = BytesIteratorIO(iter([b"ab", b"cde"]))
+
+        self.assertEqual(stream.read(1), b"a")
+        self.assertEqual(stream.read(), b"bcde")
+        self.assertEqual(stream.read(), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()